@@ -20,6 +20,7 @@ matrix_decl
 
 assign_stmt
     : ID '=' expr
+    | ID op=('+=' | '-=' | '*=' | '/=') expr
     ;
 
 expr_stmt
@@ -31,15 +32,20 @@ print_stmt
     ;
 
 expr
-    : function_call
+    : sign='-' expr
+    | expr op=('*' | '/') expr
+    | expr op=('+' | '-') expr
+    | '(' expr ')'
+    | function_call
     | matrix_literal
     | ID
     | NUMBER
     ;
 
+// Las funciones se resuelven por nombre en el visitor: sus nombres no son
+// palabras reservadas y pueden usarse como variables
 function_call
-    : 'dot' '(' expr ',' expr ')'
-    | 'matmul' '(' expr ',' expr ')'
+    : ID '(' (expr (',' expr)*)? ')'
     ;
 
 matrix_literal
@@ -55,11 +61,15 @@ row
     ;
 
 number_list
-    : NUMBER (',' NUMBER)*
+    : signed_number (',' signed_number)*
+    ;
+
+signed_number
+    : '-'? NUMBER
     ;
 
 ID      : [a-zA-Z_] [a-zA-Z0-9_]* ;
-NUMBER  : ('-'? DIGIT+ ('.' DIGIT+)? ) ;
+NUMBER  : ( DIGIT+ ('.' DIGIT+)? ) ;
 fragment DIGIT : [0-9] ;
 
 WS      : [ \t\r\n]+ -> skip ;
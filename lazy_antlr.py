@@ -0,0 +1,94 @@
+"""
+Arranque rápido de los parsers generados por ANTLR
+Importa el runtime y los módulos generados solo cuando hace falta parsear
+y mide el tiempo de cada paso del arranque
+"""
+
+import importlib
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    """
+    Acumula los tiempos de importación e inicialización del intérprete.
+    El total se mide desde `start` (por defecto, la creación del perfil)
+    hasta finish(), o hasta el reporte si no se llamó, y no incluye el
+    arranque del propio intérprete de Python.
+    """
+
+    def __init__(self, enabled=False, start=None):
+        self.enabled = enabled
+        self.start = time.perf_counter() if start is None else start
+        self.end = None
+        self.idle = 0.0
+        self.timings = []
+
+    def record(self, label, seconds):
+        if self.end is None:
+            self.timings.append((label, seconds))
+
+    @contextmanager
+    def measure(self, label):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(label, time.perf_counter() - begin)
+
+    @contextmanager
+    def excluded(self):
+        """Descuenta del total el tiempo de espera, p. ej. la entrada del usuario"""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.end is None:
+                self.idle += time.perf_counter() - begin
+
+    def finish(self):
+        """Cierra la fase de arranque: lo que se mida después no se reporta"""
+        if self.end is None:
+            self.end = time.perf_counter()
+
+    def report(self, stream=None):
+        """Imprime los tiempos medidos si el perfil está habilitado"""
+        if not self.enabled:
+            return
+        stream = stream or sys.stderr
+        print("Perfil de arranque:", file=stream)
+        width = max([len(label) for label, _ in self.timings] + [30]) + 2
+        for label, seconds in self.timings:
+            print(f"  {label:<{width}}{seconds * 1000:9.2f} ms", file=stream)
+        total = (self.end or time.perf_counter()) - self.start - self.idle
+        print(f"  {'total (sin arranque de Python)':<{width}}{total * 1000:9.2f} ms", file=stream)
+
+
+class LazyGrammar:
+    """
+    Carga diferida de un lexer y un parser generados por ANTLR.
+    Nada se importa hasta la primera llamada a load(), de modo que los
+    caminos que no parsean (ayuda, errores de argumentos, REPL vacío) no
+    pagan el costo del runtime ni la deserialización del ATN.
+    """
+
+    def __init__(self, lexer_module, parser_module, profile=None):
+        self.lexer_module = lexer_module
+        self.parser_module = parser_module
+        self.profile = profile or StartupProfile()
+        self.runtime = None
+        self.lexer_class = None
+        self.parser_class = None
+
+    def load(self):
+        """Retorna (antlr4, Lexer, Parser), importándolos la primera vez"""
+        if self.runtime is None:
+            with self.profile.measure("import antlr4"):
+                self.runtime = importlib.import_module('antlr4')
+            with self.profile.measure(f"import {self.lexer_module}/{self.parser_module}"):
+                lexer = importlib.import_module(self.lexer_module)
+                parser = importlib.import_module(self.parser_module)
+            self.lexer_class = getattr(lexer, self.lexer_module)
+            self.parser_class = getattr(parser, self.parser_module)
+        return self.runtime, self.lexer_class, self.parser_class
@@ -1,11 +1,25 @@
+import math
+import operator
+from itertools import chain
 from antlr4 import *
 from MatrixDotParser import MatrixDotParser
 from MatrixDotVisitor import MatrixDotVisitor
+from reactive import ReactiveVariables
+from reductions import CompensatedSum, compensated_sum
 
-class EvalVisitor(MatrixDotVisitor):
-    def __init__(self):
+class EvalVisitor(ReactiveVariables, MatrixDotVisitor):
+    OPS = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv}
+    # Nombre de la función -> (método, número de argumentos)
+    FUNCS = {
+        'dot': ('_dot', 2), 'matmul': ('_matmul', 2), 'rowdot': ('_rowdot', 2),
+        'coldot': ('_coldot', 2), 'sum': ('_sum', 1), 'mean': ('_mean', 1),
+        'norm': ('_norm', 1), 'max': ('_max', 1), 'min': ('_min', 1), 'trace': ('_trace', 1)
+    }
+
+    def __init__(self, reactive=False):
         super().__init__()
         self.env = {}
+        self._init_reactive(self.env, reactive)
 
     def visitProg(self, ctx:MatrixDotParser.ProgContext):
         for s in ctx.stat():
@@ -14,13 +28,17 @@ class EvalVisitor(MatrixDotVisitor):
     def visitMatrix_decl(self, ctx:MatrixDotParser.Matrix_declContext):
         name = ctx.ID().getText()
         mat = self.visit(ctx.matrix_literal())
-        self.env[name] = mat
+        self._store_variable(name, mat)
+        self._redefine_variable(name)
         return mat
 
     def visitAssign_stmt(self, ctx:MatrixDotParser.Assign_stmtContext):
         name = ctx.ID().getText()
-        val = self.visit(ctx.expr())
-        self.env[name] = val
+        if ctx.op is not None:
+            return self._inplace(name, self.visit(ctx.expr()), ctx.op.text[0])
+        val, deps = self._evaluate_tracked(ctx.expr())
+        self._store_variable(name, val)
+        self._redefine_variable(name, ctx.expr(), deps)
         return val
 
     def visitPrint_stmt(self, ctx:MatrixDotParser.Print_stmtContext):
@@ -29,28 +47,32 @@ class EvalVisitor(MatrixDotVisitor):
         return val
 
     def visitExpr(self, ctx:MatrixDotParser.ExprContext):
+        if ctx.sign is not None:
+            return self._elementwise(-1, self.visit(ctx.expr(0)), '*')
+        if ctx.op is not None:
+            a = self.visit(ctx.expr(0))
+            b = self.visit(ctx.expr(1))
+            return self._elementwise(a, b, ctx.op.text)
+        if ctx.expr():
+            return self.visit(ctx.expr(0))
         if ctx.function_call():
             return self.visit(ctx.function_call())
         if ctx.matrix_literal():
             return self.visit(ctx.matrix_literal())
         if ctx.ID():
-            name = ctx.ID().getText()
-            if name not in self.env:
-                raise Exception(f"Variable '{name}' no definida")
-            return self.env[name]
+            return self._lookup(ctx.ID().getText())
         if ctx.NUMBER():
             numtext = ctx.NUMBER().getText()
             return float(numtext) if '.' in numtext else int(numtext)
 
     def visitFunction_call(self, ctx:MatrixDotParser.Function_callContext):
-        if ctx.getChild(0).getText() == 'dot':
-            a = self.visit(ctx.expr(0))
-            b = self.visit(ctx.expr(1))
-            return self._dot(a, b)
-        else:
-            a = self.visit(ctx.expr(0))
-            b = self.visit(ctx.expr(1))
-            return self._matmul(a, b)
+        name = ctx.ID().getText()
+        if name not in self.FUNCS:
+            raise Exception(f"Función '{name}' no definida")
+        method, arity = self.FUNCS[name]
+        if len(ctx.expr()) != arity:
+            raise Exception(f"'{name}' espera {arity} argumento(s), recibió {len(ctx.expr())}")
+        return getattr(self, method)(*[self.visit(e) for e in ctx.expr()])
 
     def visitMatrix_literal(self, ctx:MatrixDotParser.Matrix_literalContext):
         if ctx.row_list() is None:
@@ -61,7 +83,7 @@ class EvalVisitor(MatrixDotVisitor):
                 rows.append([])
             else:
                 nums = []
-                for n in r.number_list().NUMBER():
+                for n in r.number_list().signed_number():
                     t = n.getText()
                     nums.append(float(t) if '.' in t else int(t))
                 rows.append(nums)
@@ -72,18 +94,126 @@ class EvalVisitor(MatrixDotVisitor):
         cols = 0 if rows == 0 else len(m[0])
         return (rows, cols)
 
-    def _flatten(self, m):
-        flat = []
-        for r in m:
-            flat.extend(r)
-        return flat
+    def _elements(self, m):
+        # Recorre los elementos fila por fila sin copiar la matriz
+        return chain.from_iterable(m) if isinstance(m, list) else iter((m,))
+
+    def _size(self, m):
+        return sum(len(r) for r in m) if isinstance(m, list) else 1
+
+    def _lookup(self, name):
+        if name not in self.env:
+            raise Exception(f"Variable '{name}' no definida")
+        return self._track_read(name)
+
+    def _elementwise(self, a, b, op):
+        f = self.OPS[op]
+        if not isinstance(a, list) and not isinstance(b, list):
+            return f(a, b)
+        if not isinstance(b, list):
+            return [[f(x, b) for x in r] for r in a]
+        if not isinstance(a, list):
+            return [[f(a, y) for y in r] for r in b]
+        if self._shape(a) != self._shape(b):
+            raise Exception(f"Dimensiones incompatibles para '{op}'")
+        return [[f(x, y) for x, y in zip(ra, rb)] for ra, rb in zip(a, b)]
+
+    def _inplace(self, name, b, op):
+        # Todo se valida antes de escribir para no dejar la matriz a medias;
+        # una vez escrita, la variable pasa a ser una entrada y sus derivadas
+        # se marcan sucias aunque la operación falle
+        a = self._lookup(name)
+        if isinstance(a, list) and isinstance(b, list) and self._shape(a) != self._shape(b):
+            raise Exception(f"Dimensiones incompatibles para '{op}='")
+        if op == '/' and any(y == 0 for y in self._elements(b)):
+            raise Exception(f"División por cero en '{op}='")
+        f = self.OPS[op]
+        try:
+            if not isinstance(a, list):
+                self.env[name] = self._elementwise(a, b, op)
+                return self.env[name]
+            if isinstance(b, list):
+                for ra, rb in zip(a, b):
+                    for j in range(len(ra)):
+                        ra[j] = f(ra[j], rb[j])
+            else:
+                for ra in a:
+                    for j in range(len(ra)):
+                        ra[j] = f(ra[j], b)
+            return a
+        except ArithmeticError as e:
+            raise Exception(f"Error aritmético en '{op}=': {e}")
+        finally:
+            self._redefine_variable(name)
 
     def _dot(self, a, b):
-        flat_a = self._flatten(a) if isinstance(a, list) else [a]
-        flat_b = self._flatten(b) if isinstance(b, list) else [b]
-        if len(flat_a) != len(flat_b):
+        if not isinstance(a, list) or not isinstance(b, list):
+            # Escalar por matriz: el escalar se difunde sobre cada elemento
+            s, m = (a, b) if not isinstance(a, list) else (b, a)
+            return s * compensated_sum(self._elements(m))
+        if self._size(a) != self._size(b):
             raise Exception("Dimensiones incompatibles para dot")
-        return sum(x*y for x, y in zip(flat_a, flat_b))
+        return compensated_sum(map(operator.mul, self._elements(a), self._elements(b)))
+
+    def _sum(self, m):
+        return compensated_sum(self._elements(m))
+
+    def _mean(self, m):
+        n = self._size(m)
+        if n == 0:
+            raise Exception("mean de una matriz vacía")
+        return self._sum(m) / n
+
+    def _norm(self, m):
+        # Norma de Frobenius
+        return math.sqrt(compensated_sum(x*x for x in self._elements(m)))
+
+    def _max(self, m):
+        if self._size(m) == 0:
+            raise Exception("max de una matriz vacía")
+        return max(self._elements(m))
+
+    def _min(self, m):
+        if self._size(m) == 0:
+            raise Exception("min de una matriz vacía")
+        return min(self._elements(m))
+
+    def _trace(self, m):
+        if not isinstance(m, list):
+            return m
+        r, c = self._shape(m)
+        if r != c:
+            raise Exception("trace requiere una matriz cuadrada")
+        return compensated_sum(m[i][i] for i in range(r))
+
+    def _rowdot(self, a, b):
+        # Producto punto de cada fila de a con la fila correspondiente de b,
+        # o con la única fila de b; el resultado es un vector columna
+        if not isinstance(a, list) or not isinstance(b, list):
+            raise Exception("Dimensiones incompatibles para rowdot")
+        ra, ca = self._shape(a)
+        rb, cb = self._shape(b)
+        if ca != cb or rb not in (ra, 1):
+            raise Exception("Dimensiones incompatibles para rowdot")
+        if rb == 1:
+            return [[compensated_sum(map(operator.mul, r, b[0]))] for r in a]
+        return [[compensated_sum(map(operator.mul, x, y))] for x, y in zip(a, b)]
+
+    def _coldot(self, a, b):
+        # Producto punto de cada columna de a con la columna correspondiente
+        # de b, o con la única columna de b; un solo recorrido por filas con
+        # un acumulador compensado por columna
+        if not isinstance(a, list) or not isinstance(b, list):
+            raise Exception("Dimensiones incompatibles para coldot")
+        ra, ca = self._shape(a)
+        rb, cb = self._shape(b)
+        if ra != rb or cb not in (ca, 1):
+            raise Exception("Dimensiones incompatibles para coldot")
+        accs = [CompensatedSum() for _ in range(ca)]
+        for x, y in zip(a, b):
+            for j, acc in enumerate(accs):
+                acc.add(x[j] * (y[0] if cb == 1 else y[j]))
+        return [[acc.result() for acc in accs]]
 
     def _matmul(self, a, b):
         ra, ca = self._shape(a)
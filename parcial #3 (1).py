@@ -13,7 +13,7 @@ class SQLGrammarModel:
             'Producciones Principales': {
                 'program': 'statement_list',
                 'statement_list': 'statement statement_list | ε',
-                'statement': 'create_stmt | select_stmt | insert_stmt | update_stmt | delete_stmt'
+                'statement': 'create_stmt | select_stmt | insert_stmt | update_stmt | delete_stmt | prepare_stmt | execute_stmt'
             },
             
             'CREATE TABLE': {
@@ -45,12 +45,18 @@ class SQLGrammarModel:
                 'delete_stmt': 'DELETE FROM ID where_opt ;'
             },
             
+            'PREPARE / EXECUTE': {
+                'prepare_stmt': 'PREPARE ID FROM STRING ;',
+                'execute_stmt': 'EXECUTE ID ( USING value_list )? ;',
+                'placeholder': '?'
+            },
+            
             'Expresiones y Condiciones': {
                 'condition': 'expr comp_operator expr | condition logic_operator condition',
                 'expr': 'ID | literal | expr binop expr',
                 'comp_operator': '= | != | > | < | >= | <=',
                 'logic_operator': 'AND | OR',
-                'literal': 'NUMBER | STRING | NULL'
+                'literal': 'NUMBER | STRING | NULL | placeholder'
             }
         }
     
@@ -3,6 +3,10 @@ Gramática de Atributos para Lenguaje SQL-CRUD
 Implementación completa del numeral 1
 """
 
+import operator
+import re
+from collections import OrderedDict
+
 class SQLAttributeGrammar:
     def __init__(self):
         self.symbol_table = {
@@ -108,7 +112,7 @@ class SQLSemanticAnalyzer:
     def __init__(self):
         self.grammar = SQLAttributeGrammar()
     
-    def analyze_create_table(self, table_name, columns):
+    def analyze_create_table(self, table_name, columns, primary_keys=None):
         """Analiza semánticamente una sentencia CREATE TABLE"""
         if table_name in self.grammar.symbol_table['tables']:
             return False, f"Table '{table_name}' already exists"
@@ -121,7 +125,9 @@ class SQLSemanticAnalyzer:
         # Agregar tabla al symbol table
         self.grammar.symbol_table['tables'][table_name] = {
             'columns': columns,
-            'primary_keys': []
+            'primary_keys': list(primary_keys or []),
+            'rows': [],
+            'pk_values': set()
         }
         
         return True, "Table created successfully"
@@ -132,6 +138,555 @@ class SQLSemanticAnalyzer:
         return data_type in valid_types
 
 
+
+# ==================== SENTENCIAS PREPARADAS Y CACHÉ DE PLANES ====================
+
+_PARAM = object()  # Posición '?' que se llena con un parámetro al ejecutar
+
+
+class SQLLiteralNormalizer:
+    """Normaliza sentencias reemplazando cada literal por un marcador '?'"""
+
+    KEYWORDS = {
+        'CREATE', 'TABLE', 'PRIMARY', 'KEY', 'SELECT', 'FROM', 'WHERE',
+        'INSERT', 'INTO', 'VALUES', 'UPDATE', 'SET', 'DELETE', 'AND', 'OR',
+        'INT', 'FLOAT', 'STRING', 'BOOL', 'DATE', 'PREPARE', 'EXECUTE', 'USING'
+    }
+    LITERAL_KEYWORDS = {'NULL': None, 'TRUE': True, 'FALSE': False}
+
+    TOKEN_RE = re.compile(r"""\s*(?:
+          (?P<STRING>'(?:[^']|'')*')
+        | (?P<NUMBER>-?\d+(?:\.\d+)?)
+        | (?P<ID>[A-Za-z_][A-Za-z0-9_]*)
+        | (?P<PARAM>\?)
+        | (?P<OP>!=|>=|<=|[=<>(),;*])
+    )""", re.VERBOSE)
+
+    @classmethod
+    def tokenize(cls, sql):
+        """Divide la sentencia en una lista de tokens (tipo, texto)"""
+        sql = sql.rstrip()
+        tokens = []
+        pos = 0
+        while pos < len(sql):
+            match = cls.TOKEN_RE.match(sql, pos)
+            if not match:
+                raise Exception(f"Error léxico: carácter inesperado '{sql[pos]}' en posición {pos}")
+            kind, text = match.lastgroup, match.group(match.lastgroup)
+            if kind == 'ID' and text.upper() in cls.LITERAL_KEYWORDS:
+                kind, text = 'LITERAL', text.upper()
+            elif kind == 'ID' and text.upper() in cls.KEYWORDS:
+                kind, text = 'KEYWORD', text.upper()
+            tokens.append((kind, text))
+            pos = match.end()
+        return tokens
+
+    @classmethod
+    def literal_value(cls, kind, text):
+        """Convierte el texto de un literal en su valor Python"""
+        if kind == 'STRING':
+            return text[1:-1].replace("''", "'")
+        if kind == 'NUMBER':
+            return float(text) if '.' in text else int(text)
+        return cls.LITERAL_KEYWORDS[text]
+
+    @classmethod
+    def normalize(cls, tokens):
+        """
+        Retorna (clave, plantilla). La clave es el texto canónico de la
+        sentencia con los literales como '?'; la plantilla guarda, en orden,
+        el valor de cada literal o _PARAM si la sentencia ya traía un '?'
+        """
+        parts = []
+        template = []
+        for kind, text in tokens:
+            if kind in ('STRING', 'NUMBER', 'LITERAL'):
+                template.append(cls.literal_value(kind, text))
+                parts.append('?')
+            elif kind == 'PARAM':
+                template.append(_PARAM)
+                parts.append('?')
+            else:
+                parts.append(text)
+        if parts and parts[-1] == ';':
+            parts.pop()
+        return ' '.join(parts), template
+
+    @staticmethod
+    def bind(template, params):
+        """Combina los literales de la plantilla con los parámetros posicionales"""
+        values = []
+        index = 0
+        for slot in template:
+            if slot is _PARAM:
+                if index >= len(params):
+                    raise Exception(f"Faltan parámetros: se recibieron {len(params)}")
+                values.append(params[index])
+                index += 1
+            else:
+                values.append(slot)
+        if index != len(params):
+            raise Exception(f"Sobran parámetros: se esperaban {index} y se recibieron {len(params)}")
+        return values
+
+
+class SQLPlan:
+    """Forma analizada y planificada de una sentencia normalizada"""
+
+    def __init__(self, kind, table):
+        self.kind = kind
+        self.table = table
+        self.columns = []        # Columnas de INSERT, SET o proyección
+        self.conditions = []     # (conector, columna, comparador) del WHERE
+        self.param_checks = []   # (columna, tipo, validador) por cada '?'
+        self.where_offset = 0    # Posición del primer parámetro del WHERE
+
+
+class SQLPlanCache:
+    """Caché LRU de planes, invalidado ante cualquier cambio de esquema"""
+
+    def __init__(self, capacity=128):
+        self.capacity = capacity
+        self.schema_version = 0
+        self.hits = 0
+        self.misses = 0
+        self._plans = OrderedDict()
+
+    def get(self, key):
+        """Retorna el plan asociado a la clave o None"""
+        plan = self._plans.get(key)
+        if plan is None:
+            self.misses += 1
+            return None
+        self._plans.move_to_end(key)
+        self.hits += 1
+        return plan
+
+    def put(self, key, plan):
+        """Guarda un plan desalojando el menos usado si se supera la capacidad"""
+        self._plans[key] = plan
+        self._plans.move_to_end(key)
+        if len(self._plans) > self.capacity:
+            self._plans.popitem(last=False)
+
+    def invalidate(self):
+        """Descarta todos los planes tras un cambio de esquema"""
+        self._plans.clear()
+        self.schema_version += 1
+
+    def __len__(self):
+        return len(self._plans)
+
+
+class _TokenCursor:
+    """Recorre los tokens de una clave normalizada"""
+
+    IDENTIFIER_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*$')
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def next(self):
+        token = self.peek()
+        if token is None:
+            raise Exception("Error sintáctico: fin inesperado de la sentencia")
+        self.pos += 1
+        return token
+
+    def accept(self, text):
+        if self.peek() == text:
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, text):
+        token = self.next()
+        if token != text:
+            raise Exception(f"Error sintáctico: se esperaba '{text}' y se encontró '{token}'")
+        return token
+
+    def identifier(self):
+        token = self.next()
+        if not self.IDENTIFIER_RE.match(token) or token in SQLLiteralNormalizer.KEYWORDS:
+            raise Exception(f"Error sintáctico: se esperaba un identificador y se encontró '{token}'")
+        return token
+
+    def end(self):
+        if self.peek() is not None:
+            raise Exception(f"Error sintáctico: token inesperado '{self.peek()}'")
+
+
+class SQLExecutor:
+    """
+    Ejecuta sentencias SQL-CRUD sobre tablas en memoria.
+    Las sentencias con la misma estructura comparten un único plan
+    analizado, de modo que solo cambian los parámetros entre ejecuciones.
+    """
+
+    COMPARATORS = {
+        '=': operator.eq, '!=': operator.ne, '>': operator.gt,
+        '<': operator.lt, '>=': operator.ge, '<=': operator.le
+    }
+
+    TYPE_CHECKS = {
+        'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+        'float': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+        'string': lambda v: isinstance(v, str),
+        'boolean': lambda v: isinstance(v, bool),
+        'date': lambda v: isinstance(v, str)
+    }
+
+    def __init__(self, cache_size=128):
+        self.analyzer = SQLSemanticAnalyzer()
+        self.plan_cache = SQLPlanCache(cache_size)
+        self.prepared = {}
+
+    @property
+    def tables(self):
+        return self.analyzer.grammar.symbol_table['tables']
+
+    # -------------------- API pública --------------------
+
+    def execute(self, sql, params=()):
+        """Ejecuta una sentencia, con '?' opcionales ligados a params"""
+        tokens = SQLLiteralNormalizer.tokenize(sql)
+        if not tokens:
+            raise Exception("Sentencia vacía")
+        head = tokens[0][1]
+        if head == 'CREATE':
+            return self._create_table(tokens)
+        if head == 'PREPARE':
+            return self._prepare_from_tokens(tokens)
+        if head == 'EXECUTE':
+            return self._execute_from_tokens(tokens, params)
+        key, template = SQLLiteralNormalizer.normalize(tokens)
+        plan = self._get_plan(key)
+        return self._run(plan, SQLLiteralNormalizer.bind(template, params))
+
+    def prepare(self, name, sql):
+        """Registra una sentencia preparada con marcadores '?'"""
+        key, template = SQLLiteralNormalizer.normalize(SQLLiteralNormalizer.tokenize(sql))
+        self._get_plan(key)
+        self.prepared[name] = (key, template)
+        return name
+
+    def execute_prepared(self, name, params=()):
+        """Ejecuta una sentencia preparada con los parámetros dados"""
+        if name not in self.prepared:
+            raise Exception(f"Sentencia preparada '{name}' no existe")
+        key, template = self.prepared[name]
+        plan = self._get_plan(key)
+        return self._run(plan, SQLLiteralNormalizer.bind(template, params))
+
+    def executemany(self, sql, seq_of_params):
+        """
+        Ejecuta una sentencia INSERT, UPDATE o DELETE una vez por cada tupla
+        de parámetros. El lote completo se valida antes de modificar la
+        tabla: si una fila es inválida no se aplica ninguna.
+        """
+        key, template = SQLLiteralNormalizer.normalize(SQLLiteralNormalizer.tokenize(sql))
+        plan = self._get_plan(key)
+        if plan.kind == 'SELECT':
+            raise Exception("executemany solo admite sentencias INSERT, UPDATE o DELETE")
+        only_params = all(slot is _PARAM for slot in template)
+        table = self.tables[plan.table]
+
+        batch = []
+        for params in seq_of_params:
+            if only_params and len(params) == len(template):
+                values = params
+            else:
+                values = SQLLiteralNormalizer.bind(template, params)
+            self._check_types(plan, values)
+            batch.append(values)
+
+        if plan.kind == 'INSERT':
+            rows = [self._build_row(plan, table, values) for values in batch]
+            keys = self._check_primary_keys(plan, table, rows)
+            table['pk_values'].update(keys)
+            table['rows'].extend(rows)
+            return len(rows)
+        return sum(self._dispatch(plan, table, values) for values in batch)
+
+    # -------------------- Planificación --------------------
+
+    def _get_plan(self, key):
+        plan = self.plan_cache.get(key)
+        if plan is None:
+            plan = self._plan(key)
+            self.plan_cache.put(key, plan)
+        return plan
+
+    def _plan(self, key):
+        """Analiza la sentencia normalizada contra la gramática de atributos"""
+        cursor = _TokenCursor(key.split(' '))
+        head = cursor.next()
+        if head == 'INSERT':
+            plan = self._plan_insert(cursor)
+        elif head == 'SELECT':
+            plan = self._plan_select(cursor)
+        elif head == 'UPDATE':
+            plan = self._plan_update(cursor)
+        elif head == 'DELETE':
+            plan = self._plan_delete(cursor)
+        else:
+            raise Exception(f"Sentencia no soportada: '{head}'")
+        cursor.end()
+        return plan
+
+    def _plan_insert(self, cursor):
+        cursor.expect('INTO')
+        plan = SQLPlan('INSERT', self._table_name(cursor))
+        cursor.expect('(')
+        plan.columns = self._identifier_list(cursor)
+        cursor.expect(')')
+        cursor.expect('VALUES')
+        cursor.expect('(')
+        count = 1
+        cursor.expect('?')
+        while cursor.accept(','):
+            cursor.expect('?')
+            count += 1
+        cursor.expect(')')
+        self._check_unique_columns(plan.columns, f"INSERT en tabla '{plan.table}'")
+        if count != len(plan.columns):
+            raise Exception(
+                f"INSERT con {len(plan.columns)} columnas y {count} valores en tabla '{plan.table}'"
+            )
+        self._validate_columns(plan.columns, plan.table)
+        plan.param_checks = [self._param_check(plan.table, col) for col in plan.columns]
+        return plan
+
+    def _plan_select(self, cursor):
+        columns = None if cursor.accept('*') else self._identifier_list(cursor)
+        cursor.expect('FROM')
+        plan = SQLPlan('SELECT', self._table_name(cursor))
+        if columns is None:
+            columns = list(self.tables[plan.table]['columns'])
+        self._validate_columns(columns, plan.table)
+        plan.columns = columns
+        self._plan_where(cursor, plan)
+        return plan
+
+    def _plan_update(self, cursor):
+        plan = SQLPlan('UPDATE', self._table_name(cursor))
+        cursor.expect('SET')
+        while True:
+            column = cursor.identifier()
+            cursor.expect('=')
+            cursor.expect('?')
+            plan.columns.append(column)
+            if not cursor.accept(','):
+                break
+        self._check_unique_columns(plan.columns, f"SET de UPDATE en tabla '{plan.table}'")
+        self._validate_columns(plan.columns, plan.table)
+        for column in plan.columns:
+            if column in self.tables[plan.table]['primary_keys']:
+                raise Exception(f"No se permite actualizar la llave primaria '{column}'")
+        plan.param_checks = [self._param_check(plan.table, col) for col in plan.columns]
+        self._plan_where(cursor, plan)
+        return plan
+
+    def _plan_delete(self, cursor):
+        cursor.expect('FROM')
+        plan = SQLPlan('DELETE', self._table_name(cursor))
+        self._plan_where(cursor, plan)
+        return plan
+
+    def _plan_where(self, cursor, plan):
+        plan.where_offset = len(plan.param_checks)
+        if not cursor.accept('WHERE'):
+            return
+        connector = None
+        while True:
+            column = cursor.identifier()
+            comparator = cursor.next()
+            if comparator not in self.COMPARATORS:
+                raise Exception(f"Operador de comparación inválido '{comparator}'")
+            if cursor.next() != '?':
+                raise Exception("Las condiciones deben comparar una columna con un literal")
+            self._validate_columns([column], plan.table)
+            plan.conditions.append((connector, column, self.COMPARATORS[comparator]))
+            plan.param_checks.append(self._param_check(plan.table, column))
+            connector = cursor.peek()
+            if connector not in ('AND', 'OR'):
+                break
+            cursor.next()
+
+    def _table_name(self, cursor):
+        name = cursor.identifier()
+        if not self.analyzer.grammar.validate_table_exists(name):
+            raise Exception(self.analyzer.grammar.errors[-1])
+        return name
+
+    def _identifier_list(self, cursor):
+        names = [cursor.identifier()]
+        while cursor.accept(','):
+            names.append(cursor.identifier())
+        return names
+
+    def _validate_columns(self, columns, table_name):
+        if not self.analyzer.grammar.validate_columns_exist(columns, table_name):
+            raise Exception(self.analyzer.grammar.errors[-1])
+
+    def _check_unique_columns(self, columns, context):
+        seen = set()
+        for column in columns:
+            if column in seen:
+                raise Exception(f"Columna '{column}' repetida en {context}")
+            seen.add(column)
+
+    def _param_check(self, table_name, column):
+        data_type = self.tables[table_name]['columns'][column]
+        return (column, data_type, self.TYPE_CHECKS[data_type])
+
+    # -------------------- Ejecución --------------------
+
+    def _run(self, plan, values):
+        self._check_types(plan, values)
+        return self._dispatch(plan, self.tables[plan.table], values)
+
+    def _dispatch(self, plan, table, values):
+        if plan.kind == 'INSERT':
+            return self._insert_row(plan, table, values)
+        where_values = values[plan.where_offset:]
+        if plan.kind == 'SELECT':
+            return [
+                tuple(row[col] for col in plan.columns)
+                for row in table['rows'] if self._matches(plan, row, where_values)
+            ]
+        if plan.kind == 'UPDATE':
+            count = 0
+            for row in table['rows']:
+                if self._matches(plan, row, where_values):
+                    for column, value in zip(plan.columns, values):
+                        row[column] = value
+                    count += 1
+            return count
+        kept = []
+        for row in table['rows']:
+            if self._matches(plan, row, where_values):
+                if table['primary_keys']:
+                    table['pk_values'].discard(tuple(row[c] for c in table['primary_keys']))
+            else:
+                kept.append(row)
+        count = len(table['rows']) - len(kept)
+        table['rows'][:] = kept
+        return count
+
+    def _check_types(self, plan, values):
+        for (column, data_type, check), value in zip(plan.param_checks, values):
+            if value is not None and not check(value):
+                raise Exception(
+                    f"Tipo incompatible para columna '{column}': "
+                    f"se esperaba {data_type} y se recibió {type(value).__name__}"
+                )
+
+    def _insert_row(self, plan, table, values):
+        row = self._build_row(plan, table, values)
+        table['pk_values'].update(self._check_primary_keys(plan, table, [row]))
+        table['rows'].append(row)
+        return 1
+
+    def _build_row(self, plan, table, values):
+        row = dict.fromkeys(table['columns'])
+        for column, value in zip(plan.columns, values):
+            row[column] = value
+        return row
+
+    def _check_primary_keys(self, plan, table, rows):
+        """Retorna las llaves primarias de las filas nuevas, sin repetidas"""
+        if not table['primary_keys']:
+            return set()
+        keys = set()
+        for row in rows:
+            key = tuple(row[c] for c in table['primary_keys'])
+            if None in key:
+                raise Exception(f"Llave primaria nula {key} en tabla '{plan.table}'")
+            if key in table['pk_values'] or key in keys:
+                raise Exception(f"Llave primaria duplicada {key} en tabla '{plan.table}'")
+            keys.add(key)
+        return keys
+
+    def _matches(self, plan, row, values):
+        # AND tiene precedencia sobre OR: se evalúa cada grupo de condiciones
+        # unidas por AND y los grupos se combinan con OR
+        result = False
+        group = True
+        for (connector, column, compare), value in zip(plan.conditions, values):
+            if connector == 'OR':
+                result = result or group
+                group = True
+            current = row[column]
+            group = group and current is not None and value is not None and compare(current, value)
+        return result or group
+
+    # -------------------- Sentencias de control --------------------
+
+    def _create_table(self, tokens):
+        """CREATE TABLE: modifica el esquema e invalida el caché de planes"""
+        cursor = _TokenCursor([text for _, text in tokens])
+        cursor.expect('CREATE')
+        cursor.expect('TABLE')
+        table_name = cursor.identifier()
+        cursor.expect('(')
+        columns = {}
+        primary_keys = []
+        while True:
+            column = cursor.identifier()
+            if column in columns:
+                raise Exception(f"Columna '{column}' repetida en CREATE TABLE '{table_name}'")
+            columns[column] = self.analyzer.grammar.type_spec(cursor.next())
+            if cursor.accept('PRIMARY'):
+                cursor.expect('KEY')
+                primary_keys.append(column)
+            if not cursor.accept(','):
+                break
+        cursor.expect(')')
+        cursor.accept(';')
+        cursor.end()
+        ok, message = self.analyzer.analyze_create_table(table_name, columns, primary_keys)
+        if not ok:
+            self.analyzer.grammar.errors.append(f"Error: {message}")
+            raise Exception(message)
+        self.plan_cache.invalidate()
+        return message
+
+    def _prepare_from_tokens(self, tokens):
+        """PREPARE nombre FROM 'sentencia';"""
+        if (len(tokens) < 4 or tokens[1][0] != 'ID' or tokens[2][1] != 'FROM'
+                or tokens[3][0] != 'STRING' or tokens[4:] not in ([], [('OP', ';')])):
+            raise Exception("Sintaxis: PREPARE nombre FROM 'sentencia';")
+        return self.prepare(tokens[1][1], SQLLiteralNormalizer.literal_value(*tokens[3]))
+
+    def _execute_from_tokens(self, tokens, params):
+        """EXECUTE nombre [USING literal, ...];"""
+        if len(tokens) < 2 or tokens[1][0] != 'ID':
+            raise Exception("Sintaxis: EXECUTE nombre [USING valor, ...];")
+        rest = tokens[2:]
+        if rest and rest[-1] == ('OP', ';'):
+            rest = rest[:-1]
+        if rest:
+            if rest[0][1] != 'USING':
+                raise Exception(f"Error sintáctico: token inesperado '{rest[0][1]}'")
+            if len(rest) % 2 != 0:
+                raise Exception("Sintaxis: EXECUTE nombre USING valor, ...;")
+            values = []
+            for i, (kind, text) in enumerate(rest[1:]):
+                if i % 2 == 1:
+                    if text != ',':
+                        raise Exception(f"Error sintáctico: se esperaba ',' y se encontró '{text}'")
+                elif kind in ('STRING', 'NUMBER', 'LITERAL'):
+                    values.append(SQLLiteralNormalizer.literal_value(kind, text))
+                else:
+                    raise Exception(f"Error sintáctico: se esperaba un literal y se encontró '{text}'")
+            params = tuple(values) + tuple(params)
+        return self.execute_prepared(tokens[1][1], params)
+
 # Ejemplo de uso
 if __name__ == "__main__":
     grammar = SQLAttributeGrammar()
@@ -141,4 +696,5 @@ if __name__ == "__main__":
     print("- SELECT con validación de tablas y columnas")
     print("- INSERT con validación de tipos")
     print("- UPDATE con validación de operaciones")
-    print("- DELETE con validación de existencia")
\ No newline at end of file
+    print("- DELETE con validación de existencia")
+    print("- PREPARE/EXECUTE con caché de planes parametrizados")
\ No newline at end of file
@@ -4,45 +4,64 @@ Intérprete principal para el lenguaje MatLang
 Numeral 3: Implementación ANTLR con Python
 """
 
+import time
+_start = time.perf_counter()
+
 import sys
 import os
-from antlr4 import *
-from MatrixLangLexer import MatrixLangLexer
-from MatrixLangParser import MatrixLangParser
-from matrix_visitor import MatrixLangEvalVisitor
+from lazy_antlr import LazyGrammar, StartupProfile
+
+# El runtime de ANTLR y el parser generado se importan solo al parsear
+profile = StartupProfile(start=_start)
+profile.record("import lazy_antlr", time.perf_counter() - _start)
+grammar = LazyGrammar('MatrixLangLexer', 'MatrixLangParser', profile=profile)
 
 def main():
     """Función principal del intérprete"""
+    options = [arg for arg in sys.argv[1:] if arg.startswith('--')]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    profile.enabled = '--startup-profile' in options
+    try:
+        run(args, reactive='--reactive' in options)
+    finally:
+        profile.report()
+
+def run(args, reactive=False):
+    """Ejecuta un archivo o inicia el modo interactivo"""
     
     print("=" * 60)
     print("        INTÉRPRETE MATLANG - OPERACIONES MATRICIALES")
     print("=" * 60)
     
     # Verificar si se proporcionó un archivo
-    if len(sys.argv) > 1:
-        input_file = sys.argv[1]
+    if args:
+        input_file = args[0]
         if not os.path.exists(input_file):
             print(f"Error: El archivo '{input_file}' no existe.")
             sys.exit(1)
         
         print(f"Ejecutando archivo: {input_file}")
-        input_stream = FileStream(input_file, encoding='utf-8')
+        antlr4 = grammar.load()[0]
+        input_stream = antlr4.FileStream(input_file, encoding='utf-8')
     else:
         print("Modo interactivo. Escribe 'exit' para salir.")
         print("Ejemplo: matrix A = [[1,2],[3,4]]; print(dot(A, A));")
         print("-" * 60)
         
+        # La tabla de símbolos se conserva entre sentencias del modo interactivo
+        visitor = None
         lines = []
         while True:
             try:
-                line = input("matlang> ")
+                with profile.excluded():
+                    line = input("matlang> ")
                 if line.strip().lower() in ['exit', 'quit', 'salir']:
                     break
                 lines.append(line)
                 if line.strip().endswith(';'):
                     input_text = '\n'.join(lines)
-                    input_stream = InputStream(input_text)
-                    process_input(input_stream)
+                    input_stream = grammar.load()[0].InputStream(input_text)
+                    visitor = process_input(input_stream, visitor, reactive)
                     lines = []
             except EOFError:
                 break
@@ -52,14 +71,18 @@ def main():
         return
 
     # Procesar entrada
-    process_input(input_stream)
+    process_input(input_stream, reactive=reactive)
 
-def process_input(input_stream):
-    """Procesa la entrada y ejecuta el programa"""
+def process_input(input_stream, visitor=None, reactive=False):
+    """Procesa la entrada y ejecuta el programa; retorna el visitor usado"""
     try:
+        antlr4, MatrixLangLexer, MatrixLangParser = grammar.load()
+        with profile.measure("import matrix_visitor"):
+            from matrix_visitor import MatrixLangEvalVisitor
+        
         # Crear lexer y parser
         lexer = MatrixLangLexer(input_stream)
-        stream = CommonTokenStream(lexer)
+        stream = antlr4.CommonTokenStream(lexer)
         parser = MatrixLangParser(stream)
         
         # Configurar manejo de errores
@@ -67,21 +90,30 @@ def process_input(input_stream):
         parser.removeErrorListeners()
         
         # Parsear el input
-        tree = parser.program()
+        with profile.measure("parse"):
+            tree = parser.program()
+        # En modo interactivo solo la primera sentencia forma parte del arranque
+        profile.finish()
         
         if parser.getNumberOfSyntaxErrors() > 0:
             print("Errores de sintaxis detectados.")
-            return
+            return visitor
         
         # Visitar el árbol de parsing
-        visitor = MatrixLangEvalVisitor()
+        if visitor is None:
+            visitor = MatrixLangEvalVisitor(reactive=reactive)
         print("Ejecutando programa...")
         print("-" * 40)
         
         result = visitor.visit(tree)
         
+        recomputed = visitor.take_recomputed()
+        if recomputed:
+            print(f"Variables recalculadas: {', '.join(recomputed)}")
+        
         print("-" * 40)
         print("Ejecución completada exitosamente.")
+        return visitor
         
     except Exception as e:
         print(f"Error durante la ejecución: {e}")
@@ -1,15 +1,36 @@
+import math
+import operator
+from itertools import chain
 from antlr4 import *
 from MatrixLangParser import MatrixLangParser
 from MatrixLangVisitor import MatrixLangVisitor
+from reactive import ReactiveVariables
+from reductions import CompensatedSum, compensated_sum
 
-class MatrixLangEvalVisitor(MatrixLangVisitor):
+class MatrixLangEvalVisitor(ReactiveVariables, MatrixLangVisitor):
     """
     Visitor para evaluar programas MatLang
     Implementa las operaciones matriciales y validaciones semánticas
     """
+
+    ELEMENTWISE_OPS = {
+        '+': operator.add,
+        '-': operator.sub,
+        '*': operator.mul,
+        '/': operator.truediv
+    }
+
+    # Funciones predefinidas y su número de argumentos. Se resuelven por
+    # nombre, así que también pueden usarse como nombres de variable
+    FUNCTION_ARITY = {
+        'dot': 2, 'matmul': 2, 'transpose': 1, 'determinant': 1, 'inverse': 1,
+        'rowdot': 2, 'coldot': 2, 'sum': 1, 'mean': 1, 'norm': 1,
+        'max': 1, 'min': 1, 'trace': 1
+    }
     
-    def __init__(self):
+    def __init__(self, reactive=False):
         self.symbol_table = {}
+        self._init_reactive(self.symbol_table, reactive)
         super().__init__()
 
     def visitProgram(self, ctx: MatrixLangParser.ProgramContext):
@@ -24,16 +45,22 @@ class MatrixLangEvalVisitor(MatrixLangVisitor):
     def visitMatrix_declaration(self, ctx: MatrixLangParser.Matrix_declarationContext):
         """Visita una declaración de matriz"""
         var_name = ctx.ID().getText()
-        matrix_value = self.visit(ctx.matrix_expression())
-        self.symbol_table[var_name] = matrix_value
+        matrix_value, deps = self._evaluate_tracked(ctx.matrix_expression())
+        self._store_variable(var_name, matrix_value)
+        self._redefine_variable(var_name, ctx.matrix_expression(), deps)
         print(f"Matriz '{var_name}' definida: {self._format_value(matrix_value)}")
         return matrix_value
 
     def visitAssignment(self, ctx: MatrixLangParser.AssignmentContext):
         """Visita una asignación"""
         var_name = ctx.ID().getText()
-        value = self.visit(ctx.expression())
-        self.symbol_table[var_name] = value
+        if ctx.op is not None:
+            value = self.visit(ctx.expression())
+            value = self._compound_assignment(var_name, value, ctx.op.text[0])
+        else:
+            value, deps = self._evaluate_tracked(ctx.expression())
+            self._store_variable(var_name, value)
+            self._redefine_variable(var_name, ctx.expression(), deps)
         print(f"Variable '{var_name}' asignada: {self._format_value(value)}")
         return value
 
@@ -51,10 +78,7 @@ class MatrixLangEvalVisitor(MatrixLangVisitor):
         elif ctx.matrix_expression():
             return self.visit(ctx.matrix_expression())
         elif ctx.ID():
-            var_name = ctx.ID().getText()
-            if var_name not in self.symbol_table:
-                raise Exception(f"Error semántico: Variable '{var_name}' no definida")
-            return self.symbol_table[var_name]
+            return self._read_variable(ctx.ID().getText())
         elif ctx.NUMBER():
             num_text = ctx.NUMBER().getText()
             return float(num_text) if '.' in num_text else int(num_text)
@@ -64,44 +88,66 @@ class MatrixLangEvalVisitor(MatrixLangVisitor):
         if ctx.matrix_literal():
             return self.visit(ctx.matrix_literal())
         elif ctx.ID():
-            var_name = ctx.ID().getText()
-            if var_name not in self.symbol_table:
-                raise Exception(f"Error semántico: Variable '{var_name}' no definida")
-            return self.symbol_table[var_name]
+            return self._read_variable(ctx.ID().getText())
+        elif ctx.NUMBER():
+            num_text = ctx.NUMBER().getText()
+            return float(num_text) if '.' in num_text else int(num_text)
+        elif ctx.function_call():
+            return self.visit(ctx.function_call())
+        elif ctx.sign is not None:
+            # Menos unario: -A equivale a -1 * A
+            operand = self.visit(ctx.matrix_expression(0))
+            return self._matrix_binary_operation(-1, operand, '*')
+        elif ctx.op is not None:
+            # Operaciones binarias: +, -, *, /
+            left = self.visit(ctx.matrix_expression(0))
+            right = self.visit(ctx.matrix_expression(1))
+            return self._matrix_binary_operation(left, right, ctx.op.text)
         elif ctx.matrix_expression():
-            # Operaciones binarias: +, -
-            if len(ctx.matrix_expression()) == 2:
-                left = self.visit(ctx.matrix_expression(0))
-                right = self.visit(ctx.matrix_expression(1))
-                operator = ctx.PLUS().getText() if ctx.PLUS() else ctx.MINUS().getText()
-                return self._matrix_binary_operation(left, right, operator)
+            # Expresión entre paréntesis
+            return self.visit(ctx.matrix_expression(0))
         return None
 
     def visitFunction_call(self, ctx: MatrixLangParser.Function_callContext):
         """Visita una llamada a función"""
+        name = ctx.ID().getText()
         try:
-            if ctx.DOT():
-                matrix1 = self.visit(ctx.expression(0))
-                matrix2 = self.visit(ctx.expression(1))
-                return self._dot_product(matrix1, matrix2)
-                
-            elif ctx.MATMUL():
-                matrix1 = self.visit(ctx.expression(0))
-                matrix2 = self.visit(ctx.expression(1))
-                return self._matrix_multiplication(matrix1, matrix2)
-                
-            elif ctx.TRANSPOSE():
-                matrix = self.visit(ctx.expression(0))
-                return self._transpose_matrix(matrix)
-                
-            elif ctx.DETERMINANT():
-                matrix = self.visit(ctx.expression(0))
-                return self._matrix_determinant(matrix)
-                
-            elif ctx.INVERSE():
-                matrix = self.visit(ctx.expression(0))
-                return self._matrix_inverse(matrix)
-                
+            if name not in self.FUNCTION_ARITY:
+                raise Exception(f"Función '{name}' no definida")
+            arity = self.FUNCTION_ARITY[name]
+            if len(ctx.expression()) != arity:
+                raise Exception(
+                    f"'{name}' espera {arity} argumento(s), recibió {len(ctx.expression())}"
+                )
+            args = [self.visit(expr) for expr in ctx.expression()]
+
+            if name == 'dot':
+                return self._dot_product(*args)
+            elif name == 'matmul':
+                return self._matrix_multiplication(*args)
+            elif name == 'transpose':
+                return self._transpose_matrix(*args)
+            elif name == 'determinant':
+                return self._matrix_determinant(*args)
+            elif name == 'inverse':
+                return self._matrix_inverse(*args)
+            elif name == 'rowdot':
+                return self._row_dot_product(*args)
+            elif name == 'coldot':
+                return self._column_dot_product(*args)
+            elif name == 'sum':
+                return self._matrix_sum(*args)
+            elif name == 'mean':
+                return self._matrix_mean(*args)
+            elif name == 'norm':
+                return self._matrix_norm(*args)
+            elif name == 'max':
+                return self._matrix_extreme(*args, max, "Máximo")
+            elif name == 'min':
+                return self._matrix_extreme(*args, min, "Mínimo")
+            elif name == 'trace':
+                return self._matrix_trace(*args)
+
         except Exception as e:
             raise Exception(f"Error en operación matricial: {str(e)}")
 
@@ -130,7 +176,7 @@ class MatrixLangEvalVisitor(MatrixLangVisitor):
             return []  # Fila vacía
         
         numbers = []
-        for num_ctx in ctx.number_list().NUMBER():
+        for num_ctx in ctx.number_list().signed_number():
             num_text = num_ctx.getText()
             numbers.append(float(num_text) if '.' in num_text else int(num_text))
         return numbers
@@ -139,16 +185,23 @@ class MatrixLangEvalVisitor(MatrixLangVisitor):
 
     def _dot_product(self, a, b):
         """Calcula el producto punto entre dos matrices/vectores"""
-        flat_a = self._flatten_matrix(a)
-        flat_b = self._flatten_matrix(b)
+        if isinstance(a, (int, float)) or isinstance(b, (int, float)):
+            # Escalar con matriz: el escalar se difunde sobre cada elemento
+            scalar, other = (a, b) if isinstance(a, (int, float)) else (b, a)
+            result = scalar * compensated_sum(self._iter_elements(other))
+            print(f"Producto punto: {self._format_value(a)} · {self._format_value(b)} = {result}")
+            return result
+
+        count_a = self._element_count(a)
+        count_b = self._element_count(b)
         
-        if len(flat_a) != len(flat_b):
+        if count_a != count_b:
             raise Exception(
                 f"Producto punto requiere mismo número de elementos. "
-                f"Recibidos: {len(flat_a)} y {len(flat_b)} elementos"
+                f"Recibidos: {count_a} y {count_b} elementos"
             )
         
-        result = sum(x * y for x, y in zip(flat_a, flat_b))
+        result = compensated_sum(map(operator.mul, self._iter_elements(a), self._iter_elements(b)))
         print(f"Producto punto: {self._format_value(a)} · {self._format_value(b)} = {result}")
         return result
 
@@ -227,8 +280,105 @@ class MatrixLangEvalVisitor(MatrixLangVisitor):
         print(f"Inversa calculada para matriz {shape}")
         return inverse
 
+    # ==================== REDUCCIONES ====================
+
+    def _matrix_sum(self, matrix):
+        """Suma todos los elementos de una matriz"""
+        result = compensated_sum(self._iter_elements(matrix))
+        print(f"Suma: {self._get_matrix_shape(matrix)} -> {result}")
+        return result
+
+    def _matrix_mean(self, matrix):
+        """Calcula el promedio de los elementos de una matriz"""
+        count = self._element_count(matrix)
+        if count == 0:
+            raise Exception("Promedio no definido para una matriz vacía")
+        result = compensated_sum(self._iter_elements(matrix)) / count
+        print(f"Promedio: {self._get_matrix_shape(matrix)} -> {result}")
+        return result
+
+    def _matrix_norm(self, matrix):
+        """Calcula la norma de Frobenius de una matriz"""
+        result = math.sqrt(compensated_sum(x * x for x in self._iter_elements(matrix)))
+        print(f"Norma: {self._get_matrix_shape(matrix)} -> {result}")
+        return result
+
+    def _matrix_extreme(self, matrix, select, label):
+        """Obtiene el máximo o el mínimo de los elementos de una matriz"""
+        if self._element_count(matrix) == 0:
+            raise Exception(f"{label} no definido para una matriz vacía")
+        result = select(self._iter_elements(matrix))
+        print(f"{label}: {self._get_matrix_shape(matrix)} -> {result}")
+        return result
+
+    def _matrix_trace(self, matrix):
+        """Suma los elementos de la diagonal de una matriz cuadrada"""
+        shape = self._get_matrix_shape(matrix)
+        if shape[0] != shape[1]:
+            raise Exception(f"Traza solo definida para matrices cuadradas. Recibida: {shape}")
+        if isinstance(matrix, (int, float)):
+            return matrix
+        result = compensated_sum(matrix[i][i] for i in range(shape[0]))
+        print(f"Traza: {shape} -> {result}")
+        return result
+
+    def _row_dot_product(self, a, b):
+        """
+        Producto punto de cada fila de A con la fila correspondiente de B,
+        o con la única fila de B. Retorna un vector columna.
+        """
+        self._require_matrices("rowdot", a, b)
+        shape_a = self._get_matrix_shape(a)
+        shape_b = self._get_matrix_shape(b)
+        if shape_a[1] != shape_b[1] or shape_b[0] not in (shape_a[0], 1):
+            raise Exception(
+                f"rowdot requiere mismas columnas y B con 1 o {shape_a[0]} filas. "
+                f"Recibidos: {shape_a} y {shape_b}"
+            )
+        if shape_b[0] == 1:
+            weights = b[0]
+            result = [[compensated_sum(map(operator.mul, row, weights))] for row in a]
+        else:
+            result = [[compensated_sum(map(operator.mul, row_a, row_b))] for row_a, row_b in zip(a, b)]
+        print(f"Producto punto por filas: {shape_a} · {shape_b} = {self._get_matrix_shape(result)}")
+        return result
+
+    def _column_dot_product(self, a, b):
+        """
+        Producto punto de cada columna de A con la columna correspondiente
+        de B, o con la única columna de B. Recorre las filas una sola vez con
+        un acumulador compensado por columna y retorna un vector fila.
+        """
+        self._require_matrices("coldot", a, b)
+        shape_a = self._get_matrix_shape(a)
+        shape_b = self._get_matrix_shape(b)
+        if shape_a[0] != shape_b[0] or shape_b[1] not in (shape_a[1], 1):
+            raise Exception(
+                f"coldot requiere mismas filas y B con 1 o {shape_a[1]} columnas. "
+                f"Recibidos: {shape_a} y {shape_b}"
+            )
+        broadcast = shape_b[1] == 1
+        accumulators = [CompensatedSum() for _ in range(shape_a[1])]
+        for row_a, row_b in zip(a, b):
+            for j, acc in enumerate(accumulators):
+                acc.add(row_a[j] * (row_b[0] if broadcast else row_b[j]))
+        result = [[acc.result() for acc in accumulators]]
+        print(f"Producto punto por columnas: {shape_a} · {shape_b} = {self._get_matrix_shape(result)}")
+        return result
+
     def _matrix_binary_operation(self, left, right, operation):
-        """Realiza operaciones binarias element-wise"""
+        """Realiza operaciones binarias element-wise con difusión de escalares"""
+        op = self.ELEMENTWISE_OPS[operation]
+        left_is_scalar = isinstance(left, (int, float))
+        right_is_scalar = isinstance(right, (int, float))
+
+        if left_is_scalar and right_is_scalar:
+            return op(left, right)
+        if right_is_scalar:
+            return [[op(x, right) for x in row] for row in left]
+        if left_is_scalar:
+            return [[op(left, y) for y in row] for row in right]
+
         shape_left = self._get_matrix_shape(left)
         shape_right = self._get_matrix_shape(right)
         
@@ -238,28 +388,82 @@ class MatrixLangEvalVisitor(MatrixLangVisitor):
                 f"Recibidos: {shape_left} y {shape_right}"
             )
         
-        if operation == '+':
-            if shape_left == (1, 1):
-                return left + right
-            return [[left[i][j] + right[i][j] for j in range(len(left[0]))] for i in range(len(left))]
-        elif operation == '-':
-            if shape_left == (1, 1):
-                return left - right
-            return [[left[i][j] - right[i][j] for j in range(len(left[0]))] for i in range(len(left))]
+        return [[op(x, y) for x, y in zip(row_l, row_r)] for row_l, row_r in zip(left, right)]
+
+    def _compound_assignment(self, var_name, value, operation):
+        """
+        Aplica A op= B actualizando en sitio el buffer existente de A.
+        Los operandos se validan antes de escribir para no dejar A a medias;
+        una vez escrita, A pasa a ser una entrada y sus variables derivadas
+        se marcan desactualizadas aunque la operación falle.
+        """
+        target = self._read_variable(var_name)
+        target_is_scalar = isinstance(target, (int, float))
+        value_is_scalar = isinstance(value, (int, float))
+
+        if not target_is_scalar and not value_is_scalar:
+            shape_target = self._get_matrix_shape(target)
+            shape_value = self._get_matrix_shape(value)
+            if shape_target != shape_value:
+                raise Exception(
+                    f"Asignación compuesta '{operation}=' requiere mismas dimensiones. "
+                    f"Recibidos: {shape_target} y {shape_value}"
+                )
+        if operation == '/' and any(x == 0 for x in self._iter_elements(value)):
+            raise Exception(f"Error semántico: División por cero en asignación compuesta '{operation}='")
+
+        op = self.ELEMENTWISE_OPS[operation]
+        try:
+            if target_is_scalar:
+                # Un escalar no tiene buffer: se reemplaza por el resultado
+                result = self._matrix_binary_operation(target, value, operation)
+                self.symbol_table[var_name] = result
+                return result
+            if value_is_scalar:
+                for row in target:
+                    for j in range(len(row)):
+                        row[j] = op(row[j], value)
+            else:
+                for row, other in zip(target, value):
+                    for j in range(len(row)):
+                        row[j] = op(row[j], other[j])
+            return target
+        except ArithmeticError as e:
+            raise Exception(f"Error aritmético en asignación compuesta '{operation}=': {e}")
+        finally:
+            self._redefine_variable(var_name)
 
     # ==================== UTILIDADES ====================
 
-    def _flatten_matrix(self, matrix):
-        """Convierte una matriz en lista plana"""
+    def _read_variable(self, var_name):
+        """Lee una variable, recalculándola antes si quedó desactualizada"""
+        if var_name not in self.symbol_table:
+            raise Exception(f"Error semántico: Variable '{var_name}' no definida")
+        return self._track_read(var_name)
+
+    def _iter_elements(self, matrix):
+        """Recorre los elementos de una matriz fila por fila sin copiarla"""
         if isinstance(matrix, (int, float)):
-            return [matrix]
-        flat = []
-        for item in matrix:
-            if isinstance(item, list):
-                flat.extend(self._flatten_matrix(item))
-            else:
-                flat.append(item)
-        return flat
+            return iter((matrix,))
+        if matrix and not isinstance(matrix[0], list):
+            return iter(matrix)
+        return chain.from_iterable(matrix)
+
+    def _element_count(self, matrix):
+        """Cuenta los elementos de una matriz sin aplanarla"""
+        if isinstance(matrix, (int, float)):
+            return 1
+        if matrix and not isinstance(matrix[0], list):
+            return len(matrix)
+        return sum(len(row) for row in matrix)
+
+    def _require_matrices(self, operation, a, b):
+        """Verifica que ambos operandos sean matrices y no escalares"""
+        if isinstance(a, (int, float)) or isinstance(b, (int, float)):
+            raise Exception(
+                f"Dimensiones incompatibles para {operation}: se requieren dos matrices. "
+                f"Recibidos: {self._format_value(a)} y {self._format_value(b)}"
+            )
 
     def _get_matrix_shape(self, matrix):
         """Obtiene la forma (filas, columnas) de una matriz"""
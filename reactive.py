@@ -0,0 +1,112 @@
+"""
+Recálculo incremental compartido por los intérpretes de MatrixDot y MatLang
+Cada variable derivada guarda la expresión que la define y las variables
+que leyó; al reasignar una de éstas, las derivadas se marcan sucias y se
+recalculan al volver a leerlas
+"""
+
+
+class ReactiveVariables:
+    """
+    Mixin para visitors de ANTLR que guardan sus variables en un diccionario.
+    El visitor llama a _init_reactive() desde su __init__ con ese diccionario
+    y lee las variables con _track_read() después de verificar que existen.
+    """
+
+    def _init_reactive(self, variables, reactive=False):
+        self._variables = variables
+        self.reactive = reactive
+        self.definitions = {}
+        self.dependencies = {}
+        self.dependents = {}
+        self.dirty = set()
+        self.recomputed = []
+        self._reads = None
+
+    def _store_variable(self, name, value):
+        """
+        Guarda el valor de una variable. Si el buffer ya pertenece a otra
+        variable se copia, para que una asignación compuesta posterior no
+        modifique ambas.
+        """
+        if isinstance(value, list) and any(value is v for v in self._variables.values()):
+            value = [list(row) if isinstance(row, list) else row for row in value]
+        self._variables[name] = value
+
+    def _track_read(self, name):
+        """Lee una variable existente, recalculándola antes si quedó desactualizada"""
+        if self._reads is not None:
+            self._reads.add(name)
+        if name in self.dirty:
+            self._recompute_variable(name)
+        return self._variables[name]
+
+    def _evaluate_tracked(self, ctx):
+        """Evalúa una expresión y retorna (valor, variables leídas)"""
+        if not self.reactive:
+            return self.visit(ctx), frozenset()
+        outer_reads, self._reads = self._reads, set()
+        try:
+            value = self.visit(ctx)
+            return value, frozenset(self._reads)
+        finally:
+            self._reads = outer_reads
+
+    def _set_definition(self, name, ctx, deps):
+        """Registra la expresión que define una variable y sus dependencias"""
+        for dep in self.dependencies.pop(name, ()):
+            self.dependents[dep].discard(name)
+        self.definitions.pop(name, None)
+        # Sin dependencias, o dependiendo de sí misma directa (A = A + 1) o
+        # indirectamente (B = A + 1; A = B * 10), la variable es una entrada:
+        # no hay expresión que recalcular y no se forman ciclos
+        if ctx is None or not deps or self._reaches(deps, name):
+            return
+        self.definitions[name] = ctx
+        self.dependencies[name] = deps
+        for dep in deps:
+            self.dependents.setdefault(dep, set()).add(name)
+
+    def _reaches(self, deps, name):
+        """Indica si alguna de deps es name o depende de name transitivamente"""
+        pending = list(deps)
+        seen = set()
+        while pending:
+            dep = pending.pop()
+            if dep == name:
+                return True
+            if dep not in seen:
+                seen.add(dep)
+                pending.extend(self.dependencies.get(dep, ()))
+        return False
+
+    def _redefine_variable(self, name, ctx=None, deps=frozenset()):
+        """Actualiza la definición y marca sucias las variables derivadas"""
+        if not self.reactive:
+            return
+        self._set_definition(name, ctx, deps)
+        self.dirty.discard(name)
+        pending = list(self.dependents.get(name, ()))
+        while pending:
+            derived = pending.pop()
+            if derived not in self.dirty:
+                self.dirty.add(derived)
+                pending.extend(self.dependents.get(derived, ()))
+
+    def _recompute_variable(self, name):
+        """Reevalúa la expresión que define una variable desactualizada"""
+        self.dirty.discard(name)
+        ctx = self.definitions[name]
+        try:
+            value, deps = self._evaluate_tracked(ctx)
+        except Exception:
+            self.dirty.add(name)
+            raise
+        self._store_variable(name, value)
+        self._set_definition(name, ctx, deps)
+        self.recomputed.append(name)
+
+    def take_recomputed(self):
+        """Retorna las variables recalculadas desde la última llamada, en orden"""
+        recomputed, self.recomputed = self.recomputed, []
+        return recomputed
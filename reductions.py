@@ -0,0 +1,43 @@
+"""
+Reducciones numéricas compartidas por los intérpretes de MatrixDot y MatLang
+Suma compensada de Neumaier en un solo recorrido: los enteros se acumulan
+de forma exacta y solo las sumas parciales flotantes llevan compensación
+"""
+
+import math
+
+
+class CompensatedSum:
+    """Acumulador de Neumaier que recibe los valores uno a uno"""
+
+    __slots__ = ('total', 'compensation')
+
+    def __init__(self):
+        self.total = 0
+        self.compensation = 0.0
+
+    def add(self, value):
+        total = self.total
+        new_total = total + value
+        # Un entero de Python es exacto y puede exceder el rango de float:
+        # solo se compensa cuando la suma parcial ya es flotante
+        if isinstance(new_total, float):
+            if abs(total) >= abs(value):
+                self.compensation += (total - new_total) + value
+            else:
+                self.compensation += (value - new_total) + total
+        self.total = new_total
+
+    def result(self):
+        total = self.total
+        if isinstance(total, float) and math.isfinite(total):
+            return total + self.compensation
+        return total
+
+
+def compensated_sum(values):
+    """Suma un iterable en un solo recorrido con compensación de Neumaier"""
+    acc = CompensatedSum()
+    for value in values:
+        acc.add(value)
+    return acc.result()
@@ -1,16 +1,29 @@
-from antlr4 import *
-from MatrixDotLexer import MatrixDotLexer
-from MatrixDotParser import MatrixDotParser
-from matrixdot_visitor import EvalVisitor
+import time
+_start = time.perf_counter()
 
-def execute(code):
-    input_stream = InputStream(code)
-    lexer = MatrixDotLexer(input_stream)
-    stream = CommonTokenStream(lexer)
-    parser = MatrixDotParser(stream)
-    tree = parser.prog()
-    visitor = EvalVisitor()
-    visitor.visit(tree)
+import sys
+from lazy_antlr import LazyGrammar, StartupProfile
+
+# El runtime de ANTLR y el parser generado se importan solo al parsear
+profile = StartupProfile(start=_start)
+profile.record("import lazy_antlr", time.perf_counter() - _start)
+grammar = LazyGrammar('MatrixDotLexer', 'MatrixDotParser', profile=profile)
+
+def execute(code, visitor=None):
+    antlr4, MatrixDotLexer, MatrixDotParser = grammar.load()
+    with profile.measure("import matrixdot_visitor"):
+        from matrixdot_visitor import EvalVisitor
+    with profile.measure("parse"):
+        input_stream = antlr4.InputStream(code)
+        lexer = MatrixDotLexer(input_stream)
+        stream = antlr4.CommonTokenStream(lexer)
+        parser = MatrixDotParser(stream)
+        tree = parser.prog()
+    with profile.measure("evaluar"):
+        if visitor is None:
+            visitor = EvalVisitor()
+        visitor.visit(tree)
+    return visitor
 
 program = """
 matrix A = [[1,2,3],[4,5,6]];
@@ -22,4 +35,6 @@ print(m);
 """
 
 if __name__ == "__main__":
+    profile.enabled = '--startup-profile' in sys.argv[1:]
     execute(program)
+    profile.report()
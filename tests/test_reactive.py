@@ -0,0 +1,106 @@
+"""Pruebas del recálculo incremental compartido por los visitors"""
+
+import importlib.util
+import os
+import unittest
+
+_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'reactive.py')
+_spec = importlib.util.spec_from_file_location('reactive', _PATH)
+reactive = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(reactive)
+
+
+class Visitor(reactive.ReactiveVariables):
+    """Visitor mínimo: cada expresión es una función que recibe el visitor"""
+
+    def __init__(self):
+        self.env = {}
+        self._init_reactive(self.env, reactive=True)
+
+    def visit(self, ctx):
+        return ctx(self)
+
+    def read(self, name):
+        return self._track_read(name)
+
+    def assign(self, name, expr):
+        value, deps = self._evaluate_tracked(expr)
+        self._store_variable(name, value)
+        self._redefine_variable(name, expr, deps)
+
+    def add_in_place(self, name, delta):
+        self.env[name] = self.read(name) + delta
+        self._redefine_variable(name)
+
+
+class ReactiveVariablesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.v = Visitor()
+
+    def test_invalidacion_transitiva(self):
+        v = self.v
+        v.assign('A', lambda v: 1)
+        v.assign('B', lambda v: v.read('A') + 1)
+        v.assign('C', lambda v: v.read('B') * 2)
+        v.assign('A', lambda v: 5)
+        self.assertEqual(v.dirty, {'B', 'C'})
+
+    def test_recalculo_diferido_al_leer(self):
+        v = self.v
+        v.assign('A', lambda v: 1)
+        v.assign('B', lambda v: v.read('A') + 1)
+        v.assign('A', lambda v: 5)
+        self.assertEqual(v.env['B'], 2)
+        self.assertEqual(v.read('B'), 6)
+        self.assertEqual(v.dirty, set())
+
+    def test_take_recomputed_en_orden(self):
+        v = self.v
+        v.assign('A', lambda v: 1)
+        v.assign('B', lambda v: v.read('A') + 1)
+        v.assign('C', lambda v: v.read('B') * 2)
+        v.assign('D', lambda v: v.read('A') - 1)
+        v.assign('A', lambda v: 3)
+        self.assertEqual(v.read('C'), 8)
+        self.assertEqual(v.take_recomputed(), ['B', 'C'])
+        self.assertEqual(v.read('D'), 2)
+        self.assertEqual(v.take_recomputed(), ['D'])
+        self.assertEqual(v.take_recomputed(), [])
+
+    def test_alias_se_copia_al_guardar(self):
+        v = self.v
+        v.assign('A', lambda v: [[1, 2]])
+        v.assign('B', lambda v: v.read('A'))
+        self.assertEqual(v.env['B'], v.env['A'])
+        self.assertIsNot(v.env['B'], v.env['A'])
+        self.assertIsNot(v.env['B'][0], v.env['A'][0])
+
+    def test_asignacion_compuesta_vuelve_entrada_a_la_derivada(self):
+        v = self.v
+        v.assign('A', lambda v: 1)
+        v.assign('B', lambda v: v.read('A') + 1)
+        v.add_in_place('B', 10)
+        v.assign('A', lambda v: 100)
+        self.assertEqual(v.read('B'), 12)
+        self.assertNotIn('B', v.definitions)
+        self.assertEqual(v.take_recomputed(), [])
+
+    def test_dependencia_ciclica_no_ensucia_la_asignada(self):
+        v = self.v
+        v.assign('A', lambda v: 1)
+        v.assign('B', lambda v: v.read('A') + 1)
+        v.assign('A', lambda v: v.read('B') * 10)
+        self.assertEqual(v.read('A'), 20)
+        self.assertEqual(v.read('B'), 21)
+
+        w = Visitor()
+        w.assign('B', lambda v: 1)
+        w.assign('A', lambda v: v.read('B') + 1)
+        w.assign('B', lambda v: v.read('A') * 2)
+        self.assertEqual(w.read('B'), 4)
+        self.assertEqual(w.read('A'), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Pruebas del ejecutor SQL-CRUD con sentencias preparadas y caché de planes"""
+
+import importlib.util
+import os
+import unittest
+
+_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'parcial #3 (2).py')
+_spec = importlib.util.spec_from_file_location('sql_crud', _PATH)
+sql_crud = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sql_crud)
+
+INSERT = "INSERT INTO usuarios (id, nombre, edad) VALUES (?, ?, ?)"
+
+
+class SQLExecutorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = sql_crud.SQLExecutor(cache_size=2)
+        self.executor.execute("CREATE TABLE usuarios (id INT PRIMARY KEY, nombre STRING, edad INT);")
+
+    def rows(self):
+        return self.executor.execute("SELECT id FROM usuarios")
+
+    def test_literales_comparten_plan(self):
+        cache = self.executor.plan_cache
+        self.executor.execute("INSERT INTO usuarios (id, nombre, edad) VALUES (1, 'Ana', 25);")
+        self.executor.execute("INSERT INTO usuarios (id, nombre, edad) VALUES (2, 'O''Brien', 31);")
+        self.executor.execute(INSERT, (3, 'Luis', 40))
+        self.assertEqual((cache.misses, cache.hits, len(cache)), (1, 2, 1))
+        self.assertEqual(self.executor.execute("SELECT nombre FROM usuarios WHERE id = 2"), [("O'Brien",)])
+
+    def test_lru_desaloja_el_menos_usado(self):
+        cache = self.executor.plan_cache
+        self.executor.execute("SELECT id FROM usuarios WHERE id = 1")
+        self.executor.execute("SELECT nombre FROM usuarios WHERE id = 1")
+        self.executor.execute("SELECT id FROM usuarios WHERE id = 2")
+        self.executor.execute("SELECT edad FROM usuarios")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get("SELECT id FROM usuarios WHERE id = ?"))
+        self.assertIsNone(cache.get("SELECT nombre FROM usuarios WHERE id = ?"))
+
+    def test_create_table_invalida_el_cache(self):
+        cache = self.executor.plan_cache
+        self.executor.prepare('ins', INSERT)
+        self.executor.execute("CREATE TABLE productos (id INT, precio FLOAT);")
+        self.assertEqual((len(cache), cache.schema_version), (0, 2))
+        self.executor.execute_prepared('ins', (1, 'Ana', 25))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(self.rows(), [(1,)])
+
+    def test_prepare_execute_con_texto_sql(self):
+        self.executor.execute("PREPARE ins FROM 'INSERT INTO usuarios (id, nombre, edad) VALUES (?, ?, 30)';")
+        self.executor.execute("EXECUTE ins USING 7, 'Eva';")
+        self.assertEqual(self.executor.execute("SELECT * FROM usuarios"), [(7, 'Eva', 30)])
+
+    def test_execute_con_numero_incorrecto_de_parametros(self):
+        self.executor.prepare('ins', INSERT)
+        with self.assertRaisesRegex(Exception, "Faltan parámetros"):
+            self.executor.execute_prepared('ins', (1, 'Ana'))
+        with self.assertRaisesRegex(Exception, "Sobran parámetros"):
+            self.executor.execute("EXECUTE ins USING 1, 'Ana', 25, 4;")
+        self.assertEqual(self.rows(), [])
+
+    def test_where_and_tiene_precedencia_sobre_or(self):
+        self.executor.executemany(INSERT, [(1, 'Ana', 25), (2, 'Luis', 40)])
+        result = self.executor.execute("SELECT id FROM usuarios WHERE id = 1 OR id = 2 AND edad > 100")
+        self.assertEqual(result, [(1,)])
+
+    def test_executemany_con_error_de_tipo_no_inserta_nada(self):
+        batch = [(i, 'x', 20) for i in range(40)] + [(40, 'x', 'veinte')]
+        with self.assertRaisesRegex(Exception, "Tipo incompatible para columna 'edad'"):
+            self.executor.executemany(INSERT, batch)
+        self.assertEqual(self.rows(), [])
+
+    def test_executemany_con_llave_duplicada_no_inserta_nada(self):
+        self.executor.execute(INSERT, (5, 'Ana', 25))
+        for batch in ([(1, 'a', 1), (1, 'b', 2)], [(2, 'a', 1), (5, 'b', 2)]):
+            with self.assertRaisesRegex(Exception, "Llave primaria duplicada"):
+                self.executor.executemany(INSERT, batch)
+        self.assertEqual(self.rows(), [(5,)])
+
+    def test_llave_primaria_nula_se_rechaza(self):
+        with self.assertRaisesRegex(Exception, "Llave primaria nula"):
+            self.executor.execute("INSERT INTO usuarios (nombre) VALUES ('sin id')")
+        with self.assertRaisesRegex(Exception, "Llave primaria nula"):
+            self.executor.executemany(INSERT, [(1, 'Ana', 25), (None, 'Eva', 30)])
+        self.assertEqual(self.rows(), [])
+
+    def test_columnas_repetidas_se_rechazan(self):
+        with self.assertRaisesRegex(Exception, "Columna 'id' repetida"):
+            self.executor.execute("INSERT INTO usuarios (id, id) VALUES (5, 6)")
+        with self.assertRaisesRegex(Exception, "Columna 'edad' repetida"):
+            self.executor.execute("UPDATE usuarios SET edad = 1, edad = 2 WHERE id = 1")
+        with self.assertRaisesRegex(Exception, "Columna 'a' repetida"):
+            self.executor.execute("CREATE TABLE t2 (a INT, a FLOAT);")
+
+    def test_executemany_rechaza_select(self):
+        with self.assertRaisesRegex(Exception, "executemany solo admite"):
+            self.executor.executemany("SELECT id FROM usuarios WHERE id = ?", [(1,)])
+
+
+if __name__ == '__main__':
+    unittest.main()